@@ -1,4 +1,4 @@
 #!/bin/bash
 
 echo "[ENTRYPOINT] Running FastAPI"
-uv run uvicorn src.main:app --host 0.0.0.0 --port 8000 --ws-ping-timeout 300
+uv run uvicorn src.main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --backlog 2048 --ws-ping-timeout 300
@@ -1,4 +1,6 @@
-from pydantic import PostgresDsn
+from typing import Literal
+
+from pydantic import PostgresDsn, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from .constants import Environment
@@ -10,6 +12,21 @@ class Config(BaseSettings):
     # Database (optional - using Convex instead of PostgreSQL)
     DATABASE_URL: PostgresDsn | None = None
     ENVIRONMENT: Environment = Environment.PRODUCTION
+    LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
+
+    # CORS
+    ALLOWED_ORIGINS: list[str] = [
+        "http://localhost:3000",
+        "http://localhost:8080",
+        "http://localhost:5173",
+        "https://tiqn.app",
+        "https://www.tiqn.app",
+        "https://api.tiqn.app",
+    ]
+
+    # Call sessions
+    SESSION_MAX_AGE_SECONDS: float = 3600  # Drop sessions idle for this long
+    SESSION_CLEANUP_INTERVAL_SECONDS: float = 300
 
     # Convex Database
     CONVEX_URL: str | None = None
@@ -26,6 +43,20 @@ class Config(BaseSettings):
     # Anthropic Claude
     ANTHROPIC_API_KEY: str
     ANTHROPIC_MODEL: str = "claude-sonnet-4-5"
+    ANTHROPIC_MAX_TOKENS: int = 1024  # Full ficha JSON is well under this
+
+    # Claude extraction result cache (set LLM_CACHE_ENABLED=false to compare)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: float = 1800
+
+    @field_validator("LOG_LEVEL", mode="before")
+    @classmethod
+    def normalize_log_level(cls, value: object) -> object:
+        """Accept any case; an empty value (e.g. an unset CI secret) means INFO."""
+        if isinstance(value, str):
+            return value.strip().upper() or "INFO"
+        return value
 
 
 settings = Config()  # type: ignore
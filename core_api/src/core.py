@@ -5,16 +5,21 @@ This module provides the main function that your team member's API should call.
 It handles the complete workflow: transcription → extraction → session management.
 """
 
+import asyncio
 import logging
 import time
-from typing import TypedDict
+from typing import Any, TypedDict
 
 from .config import settings
-from .services.canonical import extract_with_claude
-from .services.session import session_manager
+from .services.canonical import extract_with_claude, is_filler_only
+from .services.convex_db import ConvexService, get_convex_service
+from .services.session import CallSession, session_manager
 
 logger = logging.getLogger(__name__)
 
+# How long end_session waits on in-flight real-time Convex updates
+CONVEX_UPDATE_WAIT_SECONDS = 5.0
+
 
 class ProcessChunkResult(TypedDict, total=False):
     """Result from processing a text chunk."""
@@ -40,41 +45,44 @@ async def process_text_chunk(
     - Debounced Claude extraction (reduces API calls by 60-80%)
     - Throttled Convex updates (reduces DB writes by 70%)
     - Parallel execution where possible (30% latency reduction)
+    - Convex updates sent in the background (no network wait per chunk)
     """
-    import asyncio
-
     # Get or create session for this call
     session = session_manager.get_or_create_session(session_id)
 
     # Add to session transcript
     session.add_transcript_chunk(chunk_text)
 
-    # OPTIMIZATION: Debounced Claude extraction
-    should_extract = session.should_extract_with_claude(
+    # OPTIMIZATION: Debounced Claude extraction. Filler-only chunks ("mhm",
+    # "ya, bueno") are skipped before the debounce so they don't reset its
+    # tracking and delay the next real extraction
+    is_filler = is_filler_only(chunk_text)
+    should_extract = not is_filler and session.should_extract_with_claude(
         chunk_text=chunk_text,
         min_interval=5.0,  # At least 5 seconds between extractions
         min_chars=50,  # Or 50 new characters
     )
 
     if should_extract:
-        logger.info(f"Extracting with Claude (session: {session_id})")
+        logger.info("Extracting with Claude (session: %s)", session_id)
 
         # Extract canonical data using Claude
         updated_canonical = await extract_with_claude(
             transcript_chunk=chunk_text,
             full_transcript=session.full_transcript,
             existing_canonical=session.canonical_data,
+            existing_data_block=session.canonical_prompt_block(),
         )
 
         # Update tracking
         session.last_extraction_time = time.time()
-        session.last_extraction_length = len(session.full_transcript)
+        session.last_extraction_length = session.transcript_length
 
         # Update session with new canonical data
         session.update_canonical(updated_canonical)
     else:
         logger.debug(
-            f"Skipping Claude extraction (debounced) - session: {session_id}"
+            "Skipping Claude extraction (debounced) - session: %s", session_id
         )
         updated_canonical = session.canonical_data
 
@@ -87,35 +95,25 @@ async def process_text_chunk(
         )
 
         if should_update:
-            try:
-                logger.info(
-                    f"Updating Convex for session {session_id} (dispatcher: {dispatcher_id})"
-                )
-                from .services.convex_db import get_convex_service
-
-                convex = get_convex_service()
-
-                # Run Convex update in thread pool (it's synchronous)
-                convex_update_result = await asyncio.to_thread(
-                    convex.update_incident_realtime,
-                    session_id=session_id,
-                    canonical_data=updated_canonical,
-                    full_transcript=session.full_transcript,
-                    dispatcher_id=dispatcher_id,
-                )
-                logger.info(f"Convex update result: {convex_update_result}")
-            except Exception as e:
-                logger.error(f"Warning: Could not update Convex in real-time: {e}")
-                convex_update_result = {"success": False, "error": str(e)}
+            logger.info(
+                "Queueing Convex update for session %s (dispatcher: %s)", session_id, dispatcher_id
+            )
+            convex_update_result = _queue_convex_update(
+                session,
+                session_id=session_id,
+                canonical_data=updated_canonical,
+                full_transcript=session.full_transcript,
+                dispatcher_id=dispatcher_id,
+            )
         else:
-            logger.debug(f"Skipping Convex update (throttled) - session: {session_id}")
+            logger.debug("Skipping Convex update (throttled) - session: %s", session_id)
             convex_update_result = {"success": True, "throttled": True}
 
     # Build and return result
     result: ProcessChunkResult = {
         "chunk_text": chunk_text,
         "full_transcript": session.full_transcript,
-        "canonical": updated_canonical.model_dump(),
+        "canonical": session.canonical_dump(),
         "timestamp": time.time(),
         "session_info": {
             "session_id": session_id,
@@ -131,6 +129,69 @@ async def process_text_chunk(
     return result
 
 
+def _queue_convex_update(session: CallSession, **update: Any) -> dict:
+    """
+    Schedule a real-time Convex update without waiting for it.
+
+    Only the latest snapshot is kept while an update is in flight, so rapid
+    successive chunks are coalesced into a single Convex call.
+    """
+    session.pending_convex_update = update
+
+    task = session.convex_update_task
+    if task is None or task.done():
+        session.convex_update_task = asyncio.create_task(
+            _send_convex_updates(session)
+        )
+
+    return {"success": True, "queued": True}
+
+
+async def _send_convex_updates(session: CallSession) -> None:
+    """Send pending Convex updates for a session until none are left."""
+    while session.pending_convex_update is not None and not session.ended:
+        update = session.pending_convex_update
+        session.pending_convex_update = None
+
+        try:
+            convex = get_convex_service()
+
+            # Run Convex update in thread pool (it's synchronous)
+            convex_update_result = await asyncio.to_thread(
+                convex.update_incident_realtime,
+                **update,
+                is_ended=lambda: session.ended,
+            )
+            logger.info("Convex update result: %s", convex_update_result)
+        except Exception as e:
+            logger.error("Warning: Could not update Convex in real-time: %s", e)
+
+
+async def wait_for_convex_updates(
+    session_id: str, timeout: float = CONVEX_UPDATE_WAIT_SECONDS
+) -> None:
+    """
+    Wait for in-flight real-time Convex updates of a session to finish.
+
+    end_session calls this so a late real-time update does not land after
+    the final save.
+
+    Args:
+        session_id: Session identifier
+        timeout: Maximum seconds to wait
+    """
+    session = session_manager.get_session(session_id)
+    if not session or session.convex_update_task is None:
+        return
+
+    try:
+        await asyncio.wait_for(
+            asyncio.shield(session.convex_update_task), timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Timed out waiting for Convex updates of session %s", session_id)
+
+
 async def get_session_data(session_id: str) -> dict | None:
     """
     Get current data for an active session.
@@ -149,7 +210,7 @@ async def get_session_data(session_id: str) -> dict | None:
     return {
         "session_id": session_id,
         "full_transcript": session.full_transcript,
-        "canonical": session.canonical_data.model_dump(),
+        "canonical": session.canonical_dump(),
         "duration_seconds": session.get_duration(),
         "chunk_count": session.chunk_count,
         "created_at": session.created_at,
@@ -157,13 +218,16 @@ async def get_session_data(session_id: str) -> dict | None:
     }
 
 
-def end_session(
+async def end_session(
     session_id: str,
     save_to_convex: bool = True,
     dispatcher_id: str | None = None,
 ) -> dict | None:
     """
     End a call session and return final data.
+
+    Waits for in-flight real-time Convex updates first, and runs the final
+    Convex save in the thread pool so the event loop is not blocked.
     
     Args:
         session_id: Session identifier
@@ -173,16 +237,31 @@ def end_session(
     Returns:
         Final session data or None if session not found
     """
+    # Let in-flight real-time updates land before the final save
+    await wait_for_convex_updates(session_id)
+
     session = session_manager.remove_session(session_id)
     
     if not session:
         return None
+
+    # Drop any real-time update that has not been sent yet, and make a
+    # sender that outlived the wait skip its remaining Convex writes
+    session.pending_convex_update = None
+    session.ended = True
+
+    # That sender still finishes the Convex call it is in; let it return
+    # before the final save clears the active incident
+    task = session.convex_update_task
+    if task is not None and not task.done():
+        await asyncio.wait({task}, timeout=CONVEX_UPDATE_WAIT_SECONDS)
     
+    duration_seconds = session.get_duration()
     final_data = {
         "session_id": session_id,
         "full_transcript": session.full_transcript,
-        "canonical": session.canonical_data.model_dump(),
-        "duration_seconds": session.get_duration(),
+        "canonical": session.canonical_dump(),
+        "duration_seconds": duration_seconds,
         "chunk_count": session.chunk_count,
     }
     
@@ -199,35 +278,52 @@ def end_session(
         else:
             try:
                 logger.info(
-                    f"Saving final call data to Convex for session {session_id}"
+                    "Saving final call data to Convex for session %s", session_id
                 )
-                from .services.convex_db import get_convex_service
-                
                 convex = get_convex_service()
-                save_result = convex.save_emergency_call(
-                    session_id=session_id,
-                    full_transcript=session.full_transcript,
-                    canonical_data=session.canonical_data,
-                    duration_seconds=session.get_duration(),
-                    chunk_count=session.chunk_count,
-                    dispatcher_id=dispatcher_id,
+
+                # Run Convex calls in thread pool (client is synchronous)
+                final_data["convex_save"] = await asyncio.to_thread(
+                    _save_final_call_data,
+                    convex,
+                    session,
+                    duration_seconds,
+                    dispatcher_id,
                 )
-                logger.info(f"Convex save result: {save_result}")
-                final_data["convex_save"] = save_result
-
-                # Clear the active incident from app_state
-                try:
-                    convex.client.mutation("app_state:setActiveIncident", {"incidentId": None})
-                    logger.info("Cleared active incident from app_state")
-                except Exception as e:
-                    logger.warning(f"Failed to clear active incident: {e}")
             except Exception as e:
-                logger.error(f"Warning: Could not save to Convex: {e}")
+                logger.error("Warning: Could not save to Convex: %s", e)
                 final_data["convex_save"] = {"success": False, "error": str(e)}
 
     return final_data
 
 
+def _save_final_call_data(
+    convex: ConvexService,
+    session: CallSession,
+    duration_seconds: float,
+    dispatcher_id: str,
+) -> dict[str, Any]:
+    """Save the finished call to Convex and clear the active incident."""
+    save_result = convex.save_emergency_call(
+        session_id=session.session_id,
+        full_transcript=session.full_transcript,
+        canonical_data=session.canonical_data,
+        duration_seconds=duration_seconds,
+        chunk_count=session.chunk_count,
+        dispatcher_id=dispatcher_id,
+    )
+    logger.info("Convex save result: %s", save_result)
+
+    # Clear the active incident from app_state
+    try:
+        convex.client.mutation("app_state:setActiveIncident", {"incidentId": None})
+        logger.info("Cleared active incident from app_state")
+    except Exception as e:
+        logger.warning("Failed to clear active incident: %s", e)
+
+    return save_result
+
+
 def cleanup_old_sessions(max_age_seconds: float = 3600) -> int:
     """
     Remove sessions that haven't been updated recently.
@@ -240,3 +336,19 @@ def cleanup_old_sessions(max_age_seconds: float = 3600) -> int:
     """
     return session_manager.cleanup_old_sessions(max_age_seconds)
 
+
+async def run_session_cleanup(
+    interval_seconds: float = 300, max_age_seconds: float = 3600
+) -> None:
+    """
+    Periodically remove stale sessions (runs until cancelled).
+
+    Args:
+        interval_seconds: Seconds between cleanup passes
+        max_age_seconds: Maximum idle age in seconds before a session is removed
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        removed = cleanup_old_sessions(max_age_seconds)
+        if removed:
+            logger.info("Removed %s stale sessions", removed)
@@ -1,35 +1,100 @@
-from fastapi import FastAPI
+import asyncio
+import atexit
+import contextlib
+import logging
+import logging.handlers
+from collections.abc import AsyncIterator
+from queue import SimpleQueue
+
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .config import settings
+from .core import run_session_cleanup
 from .healthcheck.routes import router as health_router
 from .routes.simulation import router as simulation_router
 from .twilio_stream.routes import router as twilio_stream_router
 
-app = FastAPI(
-    title="TIQN Emergency Services Core",
-    description="Core processing functions for emergency call transcription and data extraction",
-    version="0.1.0",
-)
-
-origins = [
-    "http://localhost:3000",
-    "http://localhost:8080",
-    "http://localhost:5173",
-    "https://tiqn.app",
-    "https://www.tiqn.app",
-    "https://api.tiqn.app",
+
+def configure_logging(level: str) -> None:
+    """
+    Send log records through a queue so the event loop never blocks on I/O.
+
+    Handlers on the root logger are replaced by a QueueHandler; a
+    QueueListener thread writes the records to stderr.
+    """
+    log_queue: SimpleQueue = SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+    listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(level.upper())
+
+    listener.start()
+    atexit.register(listener.stop)
+
+
+configure_logging(settings.LOG_LEVEL)
+
+# (router, prefix) pairs mounted on the app
+ROUTERS: list[tuple[APIRouter, str]] = [
+    (health_router, ""),
+    (health_router, "/health"),
+    (twilio_stream_router, ""),
+    (simulation_router, ""),
 ]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(health_router)
-
-app.include_router(health_router, prefix="/health")
-app.include_router(twilio_stream_router)
-app.include_router(simulation_router)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Run the periodic session cleanup for the lifetime of the app."""
+    cleanup_task = asyncio.create_task(
+        run_session_cleanup(
+            interval_seconds=settings.SESSION_CLEANUP_INTERVAL_SECONDS,
+            max_age_seconds=settings.SESSION_MAX_AGE_SECONDS,
+        )
+    )
+    try:
+        yield
+    finally:
+        cleanup_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await cleanup_task
+
+
+def create_app(
+    origins: list[str],
+    routers: list[tuple[APIRouter, str]],
+    *,
+    title: str = "TIQN Emergency Services Core",
+) -> FastAPI:
+    """Build the FastAPI app with CORS middleware and the given routers."""
+    app = FastAPI(
+        title=title,
+        description="Core processing functions for emergency call transcription and data extraction",
+        version="0.1.0",
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    for router, prefix in routers:
+        app.include_router(router, prefix=prefix)
+
+    return app
+
+
+app = create_app(settings.ALLOWED_ORIGINS, ROUTERS)
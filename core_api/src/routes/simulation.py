@@ -7,7 +7,7 @@ from typing import Literal
 from fastapi import APIRouter, BackgroundTasks, HTTPException
 from pydantic import BaseModel
 
-from ..core import process_text_chunk, end_session
+from ..core import end_session, process_text_chunk
 
 router = APIRouter()
 logger = logging.getLogger("simulation")
@@ -31,7 +31,7 @@ SCENARIO_CHUNKS = [
 
 
 async def run_simulation(session_id: str, dispatcher_id: str, duration_mode: str):
-    logger.info(f"Starting simulation {session_id} with mode {duration_mode}")
+    logger.info("Starting simulation %s with mode %s", session_id, duration_mode)
 
     # Determine timing
     if duration_mode == "short":
@@ -65,13 +65,13 @@ async def run_simulation(session_id: str, dispatcher_id: str, duration_mode: str
 
         # Sleep before processing (except maybe first one? no, let's sleep to simulate real time flow)
         logger.info(
-            f"Simulation {session_id}: Sleeping {delay:.2f}s before chunk {i+1}"
+            "Simulation %s: Sleeping %.2fs before chunk %s", session_id, delay, i+1
         )
         await asyncio.sleep(delay)
 
         try:
             logger.info(
-                f"Simulation {session_id}: Processing chunk {i+1}/{num_chunks}: '{chunk}'"
+                "Simulation %s: Processing chunk %s/%s: '%s'", session_id, i+1, num_chunks, chunk
             )
             await process_text_chunk(
                 chunk_text=chunk,
@@ -80,18 +80,18 @@ async def run_simulation(session_id: str, dispatcher_id: str, duration_mode: str
                 update_convex=True,
             )
         except Exception as e:
-            logger.error(f"Simulation {session_id}: Error processing chunk: {e}")
+            logger.error("Simulation %s: Error processing chunk: %s", session_id, e)
 
     # End session
-    logger.info(f"Simulation {session_id}: Ending session")
+    logger.info("Simulation %s: Ending session", session_id)
     try:
-        end_session(
+        await end_session(
             session_id=session_id, save_to_convex=True, dispatcher_id=dispatcher_id
         )
     except Exception as e:
-        logger.error(f"Simulation {session_id}: Error ending session: {e}")
+        logger.error("Simulation %s: Error ending session: %s", session_id, e)
 
-    logger.info(f"Simulation {session_id}: Completed")
+    logger.info("Simulation %s: Completed", session_id)
 
 
 @router.post("/test/simulate-call")
@@ -1,14 +1,17 @@
 """Canonical data extraction using Claude."""
 
-import json
+import asyncio
 import logging
 import re
 from typing import Any, Tuple
 
-from anthropic import AsyncAnthropic
+import orjson
+from anthropic import AsyncAnthropic, Timeout
+from pydantic import ValidationError
 
 from ..config import settings
 from ..schemas import CanonicalV2
+from . import llm_cache
 
 # Global async client for connection reuse
 _anthropic_client: AsyncAnthropic | None = None
@@ -23,33 +26,89 @@ def get_anthropic_client() -> AsyncAnthropic:
     """Get or create the global async Anthropic client."""
     global _anthropic_client
     if _anthropic_client is None:
-        _anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        _anthropic_client = AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            max_retries=2,
+            timeout=Timeout(30.0, connect=5.0),
+        )
     return _anthropic_client
 
 # Street to commune mapping for Santiago, Chile
 STREET_COMMUNE_HINTS = [
-    (re.compile(r"\bestoril\b", re.I), "Las Condes"),
-    (re.compile(r"\bapoquindo\b", re.I), "Las Condes"),
-    (re.compile(r"\bbilbao\b", re.I), "Las Condes"),
-    (re.compile(r"\blas\s+condes\b", re.I), "Las Condes"),
-    (re.compile(r"\bkennedy\b", re.I), "Las Condes"),
-    (re.compile(r"\bprovidencia\b", re.I), "Providencia"),
-    (re.compile(r"\blos\s+leones\b", re.I), "Providencia"),
-    (re.compile(r"\bprovidence\b", re.I), "Providencia"),
-    (re.compile(r"\balameda\b", re.I), "Santiago"),
-    (re.compile(r"\bmerced\b", re.I), "Santiago"),
-    (re.compile(r"\bsan\s+pablo\b", re.I), "Santiago"),
-    (re.compile(r"\ballamand\b", re.I), "Huechuraba"),
-    (re.compile(r"\bvitacura\b", re.I), "Vitacura"),
-    (re.compile(r"\bmanquehue\b", re.I), "Vitacura"),
-    (re.compile(r"\bmacul\b", re.I), "Macul"),
-    (re.compile(r"\bñuble\b", re.I), "Ñuñoa"),
-    (re.compile(r"\birarrazaval\b", re.I), "Ñuñoa"),
-    (re.compile(r"\bgrecia\b", re.I), "Ñuñoa"),
-    (re.compile(r"\bla\s+florida\b", re.I), "La Florida"),
-    (re.compile(r"\bgran avenida\b", re.I), "La Cisterna"),
+    (r"\bestoril\b", "Las Condes"),
+    (r"\bapoquindo\b", "Las Condes"),
+    (r"\bbilbao\b", "Las Condes"),
+    (r"\blas\s+condes\b", "Las Condes"),
+    (r"\bkennedy\b", "Las Condes"),
+    (r"\bprovidencia\b", "Providencia"),
+    (r"\blos\s+leones\b", "Providencia"),
+    (r"\bprovidence\b", "Providencia"),
+    (r"\balameda\b", "Santiago"),
+    (r"\bmerced\b", "Santiago"),
+    (r"\bsan\s+pablo\b", "Santiago"),
+    (r"\ballamand\b", "Huechuraba"),
+    (r"\bvitacura\b", "Vitacura"),
+    (r"\bmanquehue\b", "Vitacura"),
+    (r"\bmacul\b", "Macul"),
+    (r"\bñuble\b", "Ñuñoa"),
+    (r"\birarrazaval\b", "Ñuñoa"),
+    (r"\bgrecia\b", "Ñuñoa"),
+    (r"\bla\s+florida\b", "La Florida"),
+    (r"\bgran avenida\b", "La Cisterna"),
 ]
 
+# All street hints fused into one pattern; group N maps to hint N - 1
+STREET_COMMUNE_RE = re.compile(
+    "|".join(f"({pattern})" for pattern, _ in STREET_COMMUNE_HINTS), re.I
+)
+
+# Precompiled post-processing patterns
+WHITESPACE_RE = re.compile(r"\s+")
+NON_DIGIT_RE = re.compile(r"[^0-9]")
+CODE_FENCE_RE = re.compile(r"```(?:json)?\s*")
+DIRECCION_NOISE_RE = re.compile(r"\b(ayuda|emergencia|me\s+desmayo|auxilio)\b", re.I)
+DIRECCION_TAIL_RE = re.compile(r"\s+y\s+(?:necesito|me|estoy|urgente).*$", re.I)
+COMUNA_PREFIX_RE = re.compile(r"\b(comuna\s+de|en\s+la\s+comuna\s+de)\b", re.I)
+COMUNA_NOISE_RE = re.compile(r"\b(ayuda|emergencia|urgencia)\b", re.I)
+YES_RE = re.compile(r"^s[ií]$", re.I)
+SEXO_M_RE = re.compile(r"^m(asculino)?$", re.I)
+SEXO_F_RE = re.compile(r"^f(emenino)?$", re.I)
+SEXO_F_HINT_RE = re.compile(r"\b(señora|mujer|femenina|niña)\b", re.I)
+SEXO_M_HINT_RE = re.compile(r"\b(señor|hombre|masculino|niño)\b", re.I)
+EDAD_VALUE_RE = re.compile(r"(\d{1,3})")
+EDAD_TEXT_RE = re.compile(r"(\d{1,3})\s*(?:años|año)", re.I)
+CODIGO_ROJO_RE = re.compile(r"\b(paro|inconsciente|no\s+respira|convulsi)", re.I)
+CODIGO_AMARILLO_RE = re.compile(r"\b(dolor\s+fuerte|accidente|fractura|desmayo)", re.I)
+AVDI_ALERTA_RE = re.compile(r"\b(alerta|consciente|orientado)", re.I)
+AVDI_VERBAL_RE = re.compile(r"responde\s+a\s+la?\s*voz", re.I)
+AVDI_DOLOR_RE = re.compile(r"responde\s*a\s+dolor", re.I)
+AVDI_INCONSCIENTE_RE = re.compile(r"\b(inconsciente|no\s+responde)", re.I)
+NO_RESPIRA_RE = re.compile(r"no\s+respira|paro", re.I)
+RESPIRA_RE = re.compile(r"\brespira", re.I)
+ADDRESS_TRIGGER_RE = re.compile(
+    r"(?:vivo en|estoy en|estamos en|la dirección es|mi direccion es|nos encontramos en|ubicado en)\s+([^\.\!\?]+)",
+    re.I,
+)
+ADDRESS_DETAIL_RE = re.compile(
+    r"([A-Za-zÁÉÍÓÚÑáéíóúñ' ]+?)\s*(\d{1,6})(?:\s*((?:oficina|departamento|depto|piso)\s*[A-Za-z0-9-]+))?(?:\s*(?:,|en\s+la\s+comuna\s+de|comuna)\s*([A-Za-zÁÉÍÓÚÑáéíóúñ' ]+))?",
+    re.I,
+)
+FIRST_PERSON_RE = re.compile(
+    r"\b(soy|estoy|necesito|me\s+llamo|hablo|vivo|puedo|llamando)\b", re.I
+)
+WORD_RE = re.compile(r"\w+")
+
+# Lowercase inside names ("Juan de la Cruz"), unless first
+NAME_PARTICLES = frozenset({"de", "del", "la", "las", "los", "y"})
+
+# Acknowledgements and hesitations that never carry ficha data on their own.
+# "si"/"no" are left out on purpose: they can answer a question in the history.
+FILLER_WORDS = frozenset({
+    "a", "ah", "aja", "ajá", "alo", "aló", "bueno", "eh", "ehm", "em", "este",
+    "hm", "hmm", "hola", "mhm", "mm", "mmm", "ok", "okay", "oye", "pucha",
+    "ver", "ya",
+})
+
 SYSTEM_PROMPT = """Eres un operador experto de tiqn (sistema de emergencias de Santiago, Chile). Tu tarea es extraer información estructurada de llamadas de emergencia y completar la ficha SOS.
 
 CONTEXTO:
@@ -100,45 +159,8 @@ REGLAS ESTRICTAS:
 
 Devuelve SOLO JSON válido, sin markdown, sin explicaciones, sin campos duplicados."""
 
-
-def _clip_full_transcript(text: str, max_chars: int = FULL_TRANSCRIPT_MAX_CHARS) -> Tuple[str, bool]:
-    """Return the last max_chars of the text and flag if truncation happened."""
-    if not text:
-        return "", False
-    if len(text) <= max_chars:
-        return text, False
-    return text[-max_chars:], True
-
-
-def build_user_prompt(
-    transcript_chunk: str,
-    full_transcript: str,
-    existing_data: CanonicalV2 | None = None,
-) -> str:
-    """Build the user prompt for Claude."""
-
-    clipped_history, truncated = _clip_full_transcript(full_transcript)
-
-    history_header = ""
-    if clipped_history:
-        suffix = f" (últimos {FULL_TRANSCRIPT_MAX_CHARS} caracteres)" if truncated else ""
-        history_header = f"\nHistorial completo de la llamada{suffix}:\n{clipped_history}\n"
-
-    context = ""
-    if existing_data:
-        # Show existing data as context
-        existing_dict = existing_data.model_dump()
-        filled_fields = {k: v for k, v in existing_dict.items() if v and v != "Verde"}
-        if filled_fields:
-            context = f"\n\nDatos ya extraídos en fragmentos anteriores:\n{json.dumps(filled_fields, ensure_ascii=False, indent=2)}\n"
-
-    return f"""Fragmento de transcripción (es-CL):{context}{history_header}
-
-Transcripción actual (nuevo fragmento):
-{transcript_chunk}
-
-Extrae SOLO la información nueva considerando todo el historial disponible y devuelve JSON con este esquema exacto:
-{{
+SCHEMA_PROMPT = """Esquema JSON exacto de la respuesta:
+{
   "nombre": "",
   "apellido": "",
   "direccion": "",
@@ -169,24 +191,131 @@ Extrae SOLO la información nueva considerando todo el historial disponible y de
   "signos_vitales": "",
   "checklist_url": "",
   "medico_turno": ""
-}}
+}"""
+
+# Anthropic prompt caching: the system prompt and schema are static, so they
+# are sent as byte-identical blocks ending in a cache breakpoint.
+EPHEMERAL_CACHE = {"type": "ephemeral"}
+
+SYSTEM_BLOCKS = [
+    {"type": "text", "text": SYSTEM_PROMPT},
+    {"type": "text", "text": SCHEMA_PROMPT, "cache_control": EPHEMERAL_CACHE},
+]
+
+
+def _clip_full_transcript(text: str, max_chars: int = FULL_TRANSCRIPT_MAX_CHARS) -> Tuple[str, bool]:
+    """Return the last max_chars of the text and flag if truncation happened."""
+    if not text:
+        return "", False
+    if len(text) <= max_chars:
+        return text, False
+    return text[-max_chars:], True
+
+
+def build_existing_data_block(existing_data: CanonicalV2) -> str:
+    """Build the context block with data extracted from previous chunks."""
+    existing_dict = existing_data.model_dump()
+    filled_fields = {k: v for k, v in existing_dict.items() if v and v != "Verde"}
+    if not filled_fields:
+        return ""
+    filled_json = orjson.dumps(filled_fields, option=orjson.OPT_INDENT_2).decode()
+    return f"Datos ya extraídos en fragmentos anteriores:\n{filled_json}\n"
+
+
+def build_user_prompt(
+    transcript_chunk: str,
+    full_transcript: str,
+) -> str:
+    """Build the per-chunk (uncached) part of the user prompt for Claude."""
+
+    clipped_history, truncated = _clip_full_transcript(full_transcript)
+
+    history_header = ""
+    if clipped_history:
+        suffix = f" (últimos {FULL_TRANSCRIPT_MAX_CHARS} caracteres)" if truncated else ""
+        history_header = f"\nHistorial completo de la llamada{suffix}:\n{clipped_history}\n"
+
+    return f"""Fragmento de transcripción (es-CL):{history_header}
+
+Transcripción actual (nuevo fragmento):
+{transcript_chunk}
+
+Extrae SOLO la información nueva considerando todo el historial disponible y devuelve JSON con el esquema exacto indicado.
 
 Recuerda: si no hay información nueva en este fragmento, devuelve todas las cadenas vacías."""
 
 
+def build_user_content(
+    transcript_chunk: str,
+    full_transcript: str,
+    existing_data: CanonicalV2 | None = None,
+    existing_block: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Build the user message content blocks for Claude.
+
+    The existing data block is marked as a cache breakpoint so consecutive
+    chunks that did not change the canonical data reuse the cached prefix.
+    Only the transcript part is sent as uncached input. Pass existing_block
+    to reuse a block already built from existing_data.
+    """
+    content: list[dict[str, Any]] = []
+
+    if existing_block is None and existing_data:
+        existing_block = build_existing_data_block(existing_data)
+    if existing_block:
+        content.append(
+            {
+                "type": "text",
+                "text": existing_block,
+                "cache_control": EPHEMERAL_CACHE,
+            }
+        )
+
+    content.append(
+        {
+            "type": "text",
+            "text": build_user_prompt(
+                transcript_chunk=transcript_chunk,
+                full_transcript=full_transcript,
+            ),
+        }
+    )
+    return content
+
+
 async def extract_with_claude(
     transcript_chunk: str,
     full_transcript: str,
     existing_canonical: CanonicalV2 | None = None,
+    existing_data_block: str | None = None,
 ) -> CanonicalV2:
-    """Extract canonical data from transcript chunk using Claude."""
+    """
+    Extract canonical data from transcript chunk using Claude.
+
+    existing_data_block, if given, is the prompt block already built from
+    existing_canonical (see CallSession.canonical_prompt_block).
+    """
+
+    # Filler-only chunks ("mhm", "ya, bueno") have nothing to extract
+    if is_filler_only(transcript_chunk):
+        logger.debug("Skipping Claude extraction for filler-only chunk: %r", transcript_chunk)
+        return existing_canonical or CanonicalV2()
+
+    # Identical chunk merged into identical data yields the same result
+    cache_key = llm_cache.make_key(transcript_chunk, full_transcript, existing_canonical)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Claude extraction cache hit (chunk_len=%d)", len(transcript_chunk))
+        return cached
 
     client = get_anthropic_client()
 
-    user_prompt = build_user_prompt(
+    user_content = build_user_content(
         transcript_chunk=transcript_chunk,
         full_transcript=full_transcript,
         existing_data=existing_canonical,
+        existing_block=existing_data_block,
     )
 
     logger.debug(
@@ -199,46 +328,72 @@ async def extract_with_claude(
     try:
         message = await client.messages.create(
             model=settings.ANTHROPIC_MODEL,
-            max_tokens=2048,
+            max_tokens=settings.ANTHROPIC_MAX_TOKENS,
             temperature=0,
-            system=SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_prompt}],
+            system=SYSTEM_BLOCKS,
+            messages=[{"role": "user", "content": user_content}],
+        )
+
+        # Track prompt cache effectiveness (cached prefix vs. fresh input)
+        usage = message.usage
+        logger.debug(
+            "Claude usage: input=%s cache_read=%s cache_creation=%s output=%s",
+            usage.input_tokens,
+            usage.cache_read_input_tokens,
+            usage.cache_creation_input_tokens,
+            usage.output_tokens,
         )
 
         # Extract JSON from response
         content = message.content[0].text if message.content else ""
 
-        # Parse JSON
-        canonical_dict = parse_json_response(content)
-        if not canonical_dict:
+        # Parse and validate JSON in one pass (no intermediate dict)
+        json_text = extract_json_text(content)
+        if json_text is None:
             # If parsing failed, return existing or default
             return existing_canonical or CanonicalV2()
 
-        # Create new canonical object
-        new_canonical = CanonicalV2(**canonical_dict)
+        if not json_text[1:-1].strip():
+            # Empty object, nothing extracted
+            return existing_canonical or CanonicalV2()
 
-        # Merge with existing data
-        if existing_canonical:
-            merged = merge_canonical_data(existing_canonical, new_canonical)
-        else:
-            merged = new_canonical
+        try:
+            new_canonical = CanonicalV2.model_validate_json(json_text)
+        except ValidationError as e:
+            logger.warning("Invalid canonical JSON from Claude: %s", e)
+            return existing_canonical or CanonicalV2()
 
-        # Post-process
-        merged = post_process_canonical(merged, transcript_chunk)
+        # Merge and post-process in the thread pool (regex-heavy, keeps the
+        # event loop free for audio and other calls)
+        merged = await asyncio.to_thread(
+            merge_and_post_process,
+            existing_canonical,
+            new_canonical,
+            transcript_chunk,
+        )
 
+        llm_cache.set(cache_key, merged)
         return merged
 
     except Exception as e:
-        print(f"Error extracting with Claude: {e}")
+        logger.error("Error extracting with Claude: %s", e)
         return existing_canonical or CanonicalV2()
 
 
-def parse_json_response(text: str) -> dict[str, Any] | None:
-    """Parse JSON from Claude's response, handling markdown code blocks."""
-    # Remove markdown code blocks
-    text = re.sub(r"```(?:json)?\s*", "", text)
+def is_filler_only(text: str) -> bool:
+    """Check if text contains only filler words (or no words at all)."""
+    return all(word in FILLER_WORDS for word in WORD_RE.findall(text.lower()))
+
+
+def extract_json_text(text: str) -> str | None:
+    """Extract the JSON object text from Claude's response, handling markdown code blocks."""
     text = text.strip()
 
+    # Fast path: a bare JSON object (the expected reply) needs no fence stripping
+    if not text.startswith("{") or "```" in text:
+        # Remove markdown code blocks
+        text = CODE_FENCE_RE.sub("", text).strip()
+
     # Find JSON object
     first_brace = text.find("{")
     last_brace = text.rfind("}")
@@ -246,25 +401,28 @@ def parse_json_response(text: str) -> dict[str, Any] | None:
     if first_brace == -1 or last_brace == -1:
         return None
 
-    json_text = text[first_brace : last_brace + 1]
-
-    try:
-        return json.loads(json_text)
-    except json.JSONDecodeError:
-        return None
+    return text[first_brace : last_brace + 1]
 
 
 def merge_canonical_data(existing: CanonicalV2, new_data: CanonicalV2) -> CanonicalV2:
     """Merge new canonical data with existing data."""
-    existing_dict = existing.model_dump()
-    new_dict = new_data.model_dump()
+    # Update only non-empty fields (don't overwrite with empty or default values)
+    updates = {
+        name: value
+        for name in CanonicalV2.model_fields
+        if (value := getattr(new_data, name)) and value != "Verde"
+    }
+
+    # Both inputs are already validated models, skip re-validation
+    return existing.model_copy(update=updates)
 
-    # Update only non-empty fields
-    for key, value in new_dict.items():
-        if value and value != "Verde":  # Don't overwrite with empty or default values
-            existing_dict[key] = value
 
-    return CanonicalV2(**existing_dict)
+def merge_and_post_process(
+    existing: CanonicalV2 | None, new_data: CanonicalV2, transcript: str
+) -> CanonicalV2:
+    """Merge new data into existing data, then post-process the result."""
+    merged = merge_canonical_data(existing, new_data) if existing else new_data
+    return post_process_canonical(merged, transcript)
 
 
 def post_process_canonical(data: CanonicalV2, transcript: str) -> CanonicalV2:
@@ -272,7 +430,7 @@ def post_process_canonical(data: CanonicalV2, transcript: str) -> CanonicalV2:
 
     # Sanitize address
     data.direccion = sanitize_direccion(data.direccion)
-    data.numero = re.sub(r"[^0-9]", "", data.numero)
+    data.numero = NON_DIGIT_RE.sub("", data.numero)
     data.comuna = sanitize_comuna(data.comuna)
 
     # Capitalize names
@@ -280,13 +438,16 @@ def post_process_canonical(data: CanonicalV2, transcript: str) -> CanonicalV2:
     data.apellido = capitalize_words(data.apellido)
     data.medico_turno = capitalize_words(data.medico_turno)
 
+    # Lowercase once for the keyword checks below
+    transcript_lower = transcript.lower()
+
     # Normalize medical fields
     data.sexo = normalize_sexo(data.sexo, transcript)
     data.edad = normalize_edad(data.edad, transcript)
-    data.codigo = normalize_codigo(data.codigo, transcript)
-    data.avdi = normalize_avdi(data.avdi, data.consciente, transcript)
+    data.codigo = normalize_codigo(data.codigo, transcript_lower)
+    data.avdi = normalize_avdi(data.avdi, data.consciente, transcript_lower)
     data.estado_respiratorio = normalize_respiratorio(
-        data.estado_respiratorio, data.respira, transcript
+        data.estado_respiratorio, data.respira, transcript_lower
     )
     data.consciente = normalize_yes_no(data.consciente)
     data.respira = normalize_yes_no(data.respira)
@@ -297,10 +458,9 @@ def post_process_canonical(data: CanonicalV2, transcript: str) -> CanonicalV2:
         "región metropolitana",
         "rm",
     ]:
-        for pattern, comuna in STREET_COMMUNE_HINTS:
-            if pattern.search(data.direccion):
-                data.comuna = comuna
-                break
+        comuna = infer_comuna_from_street(data.direccion)
+        if comuna:
+            data.comuna = comuna
 
     # Extract address from text if missing
     if not data.direccion or not data.numero:
@@ -308,7 +468,7 @@ def post_process_canonical(data: CanonicalV2, transcript: str) -> CanonicalV2:
         if not data.direccion and extracted["direccion"]:
             data.direccion = sanitize_direccion(extracted["direccion"])
         if not data.numero and extracted["numero"]:
-            data.numero = re.sub(r"[^0-9]", "", extracted["numero"])
+            data.numero = NON_DIGIT_RE.sub("", extracted["numero"])
         if not data.comuna and extracted["comuna"]:
             data.comuna = sanitize_comuna(extracted["comuna"])
         if not data.depto and extracted["extra"]:
@@ -322,19 +482,21 @@ def post_process_canonical(data: CanonicalV2, transcript: str) -> CanonicalV2:
             f"https://www.google.com/maps/search/?api=1&query={query}"
         )
 
-    # Infer from first-person speech
-    if (
-        not data.consciente
-        and is_first_person(transcript)
-        and "inconsciente" not in transcript.lower()
-    ):
-        data.consciente = "si"
-    if (
-        not data.respira
-        and is_first_person(transcript)
-        and "no respira" not in transcript.lower()
-    ):
-        data.respira = "si"
+    # Infer from first-person speech (scan at most once)
+    if not data.consciente or not data.respira:
+        first_person = is_first_person(transcript)
+        if (
+            not data.consciente
+            and first_person
+            and "inconsciente" not in transcript_lower
+        ):
+            data.consciente = "si"
+        if (
+            not data.respira
+            and first_person
+            and "no respira" not in transcript_lower
+        ):
+            data.respira = "si"
 
     # Set motivo to full transcript if empty
     if not data.motivo:
@@ -345,32 +507,57 @@ def post_process_canonical(data: CanonicalV2, transcript: str) -> CanonicalV2:
 
 def sanitize_direccion(direccion: str) -> str:
     """Clean up street address."""
-    s = re.sub(r"[\n\r]+", " ", direccion)
-    s = re.sub(r"\s+", " ", s).strip()
-    s = re.sub(r"\b(ayuda|emergencia|me\s+desmayo|auxilio)\b", "", s, flags=re.I)
-    s = re.sub(r"\s+y\s+(?:necesito|me|estoy|urgente).*$", "", s, flags=re.I)
+    # Newlines are whitespace too, so one pass collapses both
+    s = WHITESPACE_RE.sub(" ", direccion).strip()
+    s = DIRECCION_NOISE_RE.sub("", s)
+    s = DIRECCION_TAIL_RE.sub("", s)
     return s.strip()
 
 
 def sanitize_comuna(comuna: str) -> str:
     """Clean up comuna name."""
-    s = re.sub(r"[\n\r]+", " ", comuna)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = WHITESPACE_RE.sub(" ", comuna).strip()
     s = s.split(",")[0].strip()
-    s = re.sub(r"\b(comuna\s+de|en\s+la\s+comuna\s+de)\b", "", s, flags=re.I)
-    s = re.sub(r"\b(ayuda|emergencia|urgencia)\b", "", s, flags=re.I)
+    s = COMUNA_PREFIX_RE.sub("", s)
+    s = COMUNA_NOISE_RE.sub("", s)
     return s.strip()
 
 
+def infer_comuna_from_street(direccion: str) -> str:
+    """Infer comuna from the highest-priority street hint in the address."""
+    # Single scan; earlier hints in the list still take priority
+    best = min(
+        (match.lastindex for match in STREET_COMMUNE_RE.finditer(direccion)),
+        default=None,
+    )
+    return STREET_COMMUNE_HINTS[best - 1][1] if best else ""
+
+
 def capitalize_words(text: str) -> str:
-    """Capitalize each word."""
-    return text.strip().title() if text else ""
+    """Capitalize each word, keeping Spanish name particles lowercase."""
+    if not text:
+        return ""
+    words = text.split()
+    return " ".join(
+        word.lower() if i and word.lower() in NAME_PARTICLES else capitalize_name_part(word)
+        for i, word in enumerate(words)
+    )
+
+
+def capitalize_name_part(word: str) -> str:
+    """Capitalize a word, including each part of hyphenated or apostrophe names."""
+    if "-" in word or "'" in word:
+        return "-".join(
+            "'".join(piece.capitalize() for piece in part.split("'"))
+            for part in word.split("-")
+        )
+    return word.capitalize()
 
 
 def normalize_yes_no(value: str) -> str:
     """Normalize yes/no values to si/no."""
     s = value.lower().strip()
-    if re.match(r"^s[ií]$", s) or "si" in s:
+    if YES_RE.match(s) or "si" in s:
         return "si"
     if s == "no" or "no" in s:
         return "no"
@@ -384,27 +571,27 @@ def normalize_yes_no(value: str) -> str:
 def normalize_sexo(value: str, transcript: str) -> str:
     """Normalize sex to M/F."""
     s = value.lower()
-    if re.match(r"^m(asculino)?$", s):
+    if SEXO_M_RE.match(s):
         return "M"
-    if re.match(r"^f(emenino)?$", s):
+    if SEXO_F_RE.match(s):
         return "F"
     # Infer from transcript
-    if re.search(r"\b(señora|mujer|femenina|niña)\b", transcript, re.I):
+    if SEXO_F_HINT_RE.search(transcript):
         return "F"
-    if re.search(r"\b(señor|hombre|masculino|niño)\b", transcript, re.I):
+    if SEXO_M_HINT_RE.search(transcript):
         return "M"
     return ""
 
 
 def normalize_edad(value: str, transcript: str) -> str:
     """Normalize age to numeric string."""
-    match = re.search(r"(\d{1,3})", value)
+    match = EDAD_VALUE_RE.search(value)
     if match:
         age = int(match.group(1))
         if 0 <= age <= 120:
             return str(age)
     # Try to extract from transcript
-    match = re.search(r"(\d{1,3})\s*(?:años|año)", transcript, re.I)
+    match = EDAD_TEXT_RE.search(transcript)
     if match:
         age = int(match.group(1))
         if 0 <= age <= 120:
@@ -412,8 +599,8 @@ def normalize_edad(value: str, transcript: str) -> str:
     return ""
 
 
-def normalize_codigo(value: str, transcript: str) -> str:
-    """Normalize triage code."""
+def normalize_codigo(value: str, transcript_lower: str) -> str:
+    """Normalize triage code (transcript must already be lowercased)."""
     s = value.lower()
     if "rojo" in s:
         return "Rojo"
@@ -422,28 +609,26 @@ def normalize_codigo(value: str, transcript: str) -> str:
     if "verde" in s:
         return "Verde"
     # Infer from transcript
-    t = transcript.lower()
-    if re.search(r"\b(paro|inconsciente|no\s+respira|convulsi)", t):
+    if CODIGO_ROJO_RE.search(transcript_lower):
         return "Rojo"
-    if re.search(r"\b(dolor\s+fuerte|accidente|fractura|desmayo)", t):
+    if CODIGO_AMARILLO_RE.search(transcript_lower):
         return "Amarillo"
     return "Verde"
 
 
-def normalize_avdi(avdi: str, consciente: str, transcript: str) -> str:
-    """Normalize AVDI scale."""
+def normalize_avdi(avdi: str, consciente: str, transcript_lower: str) -> str:
+    """Normalize AVDI scale (transcript must already be lowercased)."""
     v = avdi.lower().strip()
     if v in ["alerta", "verbal", "dolor", "inconsciente"]:
         return v
     # Infer from transcript
-    t = transcript.lower()
-    if re.search(r"\b(alerta|consciente|orientado)", t):
+    if AVDI_ALERTA_RE.search(transcript_lower):
         return "alerta"
-    if re.search(r"responde\s+a\s+la?\s*voz", t):
+    if AVDI_VERBAL_RE.search(transcript_lower):
         return "verbal"
-    if re.search(r"responde\s*a\s+dolor", t):
+    if AVDI_DOLOR_RE.search(transcript_lower):
         return "dolor"
-    if re.search(r"\b(inconsciente|no\s+responde)", t):
+    if AVDI_INCONSCIENTE_RE.search(transcript_lower):
         return "inconsciente"
     # Infer from consciente field
     norm_consciente = normalize_yes_no(consciente)
@@ -454,8 +639,8 @@ def normalize_avdi(avdi: str, consciente: str, transcript: str) -> str:
     return ""
 
 
-def normalize_respiratorio(estado: str, respira: str, transcript: str) -> str:
-    """Normalize respiratory status."""
+def normalize_respiratorio(estado: str, respira: str, transcript_lower: str) -> str:
+    """Normalize respiratory status (transcript must already be lowercased)."""
     v = estado.lower().strip()
     if v in ["respira", "no respira"]:
         return v
@@ -466,26 +651,23 @@ def normalize_respiratorio(estado: str, respira: str, transcript: str) -> str:
     if norm_respira == "no":
         return "no respira"
     # Infer from transcript
-    t = transcript.lower()
-    if re.search(r"no\s+respira|paro", t):
+    if NO_RESPIRA_RE.search(transcript_lower):
         return "no respira"
-    if re.search(r"\brespira", t):
+    if RESPIRA_RE.search(transcript_lower):
         return "respira"
     return ""
 
 
 def extract_address_from_text(text: str) -> dict[str, str]:
     """Extract address parts from text."""
-    normalized = re.sub(r"\s+", " ", text)
-    pattern = r"(?:vivo en|estoy en|estamos en|la dirección es|mi direccion es|nos encontramos en|ubicado en)\s+([^\.\!\?]+)"
-    match = re.search(pattern, normalized, re.I)
+    normalized = WHITESPACE_RE.sub(" ", text)
+    match = ADDRESS_TRIGGER_RE.search(normalized)
 
     if not match:
         return {"direccion": "", "numero": "", "comuna": "", "extra": ""}
 
     segment = match.group(1)
-    detail_pattern = r"([A-Za-zÁÉÍÓÚÑáéíóúñ' ]+?)\s*(\d{1,6})(?:\s*((?:oficina|departamento|depto|piso)\s*[A-Za-z0-9-]+))?(?:\s*(?:,|en\s+la\s+comuna\s+de|comuna)\s*([A-Za-zÁÉÍÓÚÑáéíóúñ' ]+))?"
-    detail_match = re.search(detail_pattern, segment, re.I)
+    detail_match = ADDRESS_DETAIL_RE.search(segment)
 
     if not detail_match:
         return {"direccion": "", "numero": "", "comuna": "", "extra": ""}
@@ -500,8 +682,4 @@ def extract_address_from_text(text: str) -> dict[str, str]:
 
 def is_first_person(text: str) -> bool:
     """Check if text contains first-person speech."""
-    return bool(
-        re.search(
-            r"\b(soy|estoy|necesito|me\s+llamo|hablo|vivo|puedo|llamando)\b", text, re.I
-        )
-    )
+    return bool(FIRST_PERSON_RE.search(text))
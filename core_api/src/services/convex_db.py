@@ -1,7 +1,7 @@
 """Convex database service for saving emergency call data."""
 
 import logging
-from typing import Any
+from typing import Any, Callable
 from convex import ConvexClient
 
 from ..config import settings
@@ -192,7 +192,7 @@ class ConvexService:
         try:
             return self.client.query("incidents:get", {"id": incident_id})
         except Exception as e:
-            print(f"Error fetching incident: {e}")
+            logger.error("Error fetching incident: %s", e)
             return None
     
     def get_patient(self, patient_id: str) -> dict[str, Any] | None:
@@ -200,7 +200,7 @@ class ConvexService:
         try:
             return self.client.query("patients:get", {"id": patient_id})
         except Exception as e:
-            print(f"Error fetching patient: {e}")
+            logger.error("Error fetching patient: %s", e)
             return None
     
     def list_recent_incidents(self, limit: int = 10) -> list[dict[str, Any]]:
@@ -208,7 +208,7 @@ class ConvexService:
         try:
             return self.client.query("incidents:listRecent", {"limit": limit})
         except Exception as e:
-            print(f"Error listing incidents: {e}")
+            logger.error("Error listing incidents: %s", e)
             return []
     
     def update_interim_transcript(
@@ -216,6 +216,7 @@ class ConvexService:
         session_id: str,
         live_transcript: str,
         dispatcher_id: str,
+        is_ended: Callable[[], bool] | None = None,
     ) -> dict[str, Any]:
         """
         Update only the live transcript in Convex (for interim results).
@@ -227,10 +228,15 @@ class ConvexService:
             session_id: Unique session identifier (becomes externalCallId)
             live_transcript: Current live transcript (finalized + interim)
             dispatcher_id: ID of the dispatcher handling the call
+            is_ended: Checked before each write; once it returns True the call
+                has been saved and closed, so the remaining writes are skipped
 
         Returns:
             Dict with success status and incident_id
         """
+        if is_ended is not None and is_ended():
+            return {"success": False, "skipped": True, "type": "interim"}
+
         try:
             # Minimal update payload - just the live transcript
             update_data = {
@@ -241,14 +247,16 @@ class ConvexService:
             }
 
             # Call Convex mutation (creates if doesn't exist, updates if it does)
-            logger.debug(f"Updating interim transcript for session {session_id}")
+            logger.debug("Updating interim transcript for session %s", session_id)
             incident_id = self.client.mutation("incidents:createOrUpdate", update_data)
 
-            # Update app_state to track this as the active incident
-            try:
-                self.client.mutation("app_state:setActiveIncident", {"incidentId": incident_id})
-            except Exception as e:
-                logger.warning(f"Failed to set active incident in app_state: {e}")
+            # Update app_state to track this as the active incident, unless
+            # the final save already closed it
+            if is_ended is None or not is_ended():
+                try:
+                    self.client.mutation("app_state:setActiveIncident", {"incidentId": incident_id})
+                except Exception as e:
+                    logger.warning("Failed to set active incident in app_state: %s", e)
 
             return {
                 "success": True,
@@ -258,7 +266,7 @@ class ConvexService:
             }
 
         except Exception as e:
-            logger.error(f"Failed to update interim transcript in Convex: {e}")
+            logger.error("Failed to update interim transcript in Convex: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -271,6 +279,7 @@ class ConvexService:
         canonical_data: CanonicalV2,
         full_transcript: str,
         dispatcher_id: str,
+        is_ended: Callable[[], bool] | None = None,
     ) -> dict[str, Any]:
         """
         Update incident record in real-time as data comes in.
@@ -283,6 +292,8 @@ class ConvexService:
             canonical_data: Latest extracted emergency data
             full_transcript: Current complete transcript
             dispatcher_id: Convex ID of dispatcher handling the call
+            is_ended: Checked before each write; once it returns True the call
+                has been saved and closed, so the remaining writes are skipped
             
         Returns:
             Dict with success status and incident ID
@@ -294,8 +305,8 @@ class ConvexService:
             canonical = CanonicalV2(**canonical_data)
         
         try:
-            logger.info(f"Creating/Updating incident for session {session_id}")
-            logger.info(f"Dispatcher ID: {dispatcher_id}")
+            logger.info("Creating/Updating incident for session %s", session_id)
+            logger.info("Dispatcher ID: %s", dispatcher_id)
             # Build update data from canonical
             update_data = {
                 "callSessionId": session_id,
@@ -350,17 +361,25 @@ class ConvexService:
             # Remove None values for cleaner database
             update_data = {k: v for k, v in update_data.items() if v is not None}
             
+            if is_ended is not None and is_ended():
+                logger.info("Session %s ended, skipping real-time update", session_id)
+                return {"success": False, "skipped": True, "session_id": session_id}
+
             # Call Convex mutation (creates if doesn't exist, updates if it does)
-            logger.info(f"Calling incidents:createOrUpdate with data: {update_data}")
+            logger.info("Calling incidents:createOrUpdate with data: %s", update_data)
             incident_id = self.client.mutation("incidents:createOrUpdate", update_data)
-            logger.info(f"Successfully updated incident {incident_id}")
+            logger.info("Successfully updated incident %s", incident_id)
+
+            if is_ended is not None and is_ended():
+                # Don't re-activate an incident the final save already closed
+                return {"success": True, "incident_id": incident_id, "session_id": session_id}
 
             # Update app_state to track this as the active incident
             try:
                 self.client.mutation("app_state:setActiveIncident", {"incidentId": incident_id})
-                logger.info(f"Set active incident to {incident_id}")
+                logger.info("Set active incident to %s", incident_id)
             except Exception as e:
-                logger.warning(f"Failed to set active incident in app_state: {e}")
+                logger.warning("Failed to set active incident in app_state: %s", e)
 
             return {
                 "success": True,
@@ -369,7 +388,7 @@ class ConvexService:
             }
             
         except Exception as e:
-            logger.error(f"Failed to update incident in Convex: {e}", exc_info=True)
+            logger.error("Failed to update incident in Convex: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": str(e),
@@ -0,0 +1,74 @@
+"""In-memory cache of Claude extraction results."""
+
+import hashlib
+import time
+from collections import OrderedDict
+
+from ..config import settings
+from ..schemas import CanonicalV2
+
+# Cache limits
+CACHE_ENABLED = settings.LLM_CACHE_ENABLED
+CACHE_MAX_ENTRIES = settings.LLM_CACHE_MAX_ENTRIES
+CACHE_TTL_SECONDS = settings.LLM_CACHE_TTL_SECONDS
+
+# key -> (expires_at, canonical), oldest first
+_cache: OrderedDict[str, tuple[float, CanonicalV2]] = OrderedDict()
+
+
+def make_key(
+    transcript_chunk: str,
+    full_transcript: str,
+    existing_canonical: CanonicalV2 | None,
+) -> str:
+    """
+    Build the key for a chunk, the call history it is read against, and the
+    data it is merged into.
+
+    The history is part of the key because the prompt includes it: a short
+    answer like "no" means different things in different calls. The chunk is
+    matched ignoring surrounding/repeated whitespace only; case is kept since
+    it can end up in extracted values.
+    """
+    existing_json = existing_canonical.model_dump_json() if existing_canonical else ""
+    normalized_chunk = " ".join(transcript_chunk.split())
+    return hashlib.blake2b(
+        b"\x00".join(
+            (existing_json.encode(), full_transcript.encode(), normalized_chunk.encode())
+        ),
+        digest_size=16,
+    ).hexdigest()
+
+
+def get(key: str) -> CanonicalV2 | None:
+    """Return a copy of the cached result, or None on a miss or expired entry."""
+    if not CACHE_ENABLED:
+        return None
+
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        del _cache[key]
+        return None
+
+    _cache.move_to_end(key)
+    return value.model_copy()
+
+
+def set(key: str, value: CanonicalV2) -> None:
+    """Store a copy of the result, evicting the least recently used entries."""
+    if not CACHE_ENABLED:
+        return
+
+    _cache[key] = (time.monotonic() + CACHE_TTL_SECONDS, value.model_copy())
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+def clear() -> None:
+    """Drop all cached results."""
+    _cache.clear()
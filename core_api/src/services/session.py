@@ -1,11 +1,13 @@
 """Session management for ongoing emergency calls."""
 
+import asyncio
 import hashlib
-import json
 import time
-from typing import Dict
+from collections import OrderedDict
+from typing import Any, Callable
 
 from ..schemas import CanonicalV2
+from .canonical import build_existing_data_block
 
 
 class CallSession:
@@ -13,11 +15,18 @@ class CallSession:
 
     def __init__(self, session_id: str):
         self.session_id = session_id
-        self.full_transcript = ""
+        # Final chunks are joined lazily (appending to one string is quadratic)
+        self._transcript_chunks: list[str] = []
+        self._full_transcript: str | None = ""
+        self.transcript_length = 0  # len(full_transcript) without joining
         self.canonical_data = CanonicalV2()
+        self._canonical_dump: dict[str, Any] | None = None
+        self._canonical_prompt_block: str | None = None
         self.created_at = time.time()
-        self.last_updated = time.time()
+        self.last_updated = self.created_at
+        self.created_monotonic = time.monotonic()  # For durations
         self.chunk_count = 0
+        self.on_touch: Callable[[str], None] | None = None  # Set by SessionManager
 
         # Optimization tracking fields
         self.last_extraction_time: float = 0
@@ -25,21 +34,48 @@ class CallSession:
         self.last_convex_update_time: float = 0
         self.last_convex_canonical_hash: str = ""
 
+        # Background Convex updates (latest pending snapshot + sender task)
+        self.pending_convex_update: dict[str, Any] | None = None
+        self.convex_update_task: asyncio.Task | None = None
+        # Set by end_session; background Convex writes check it so a late one
+        # cannot land after the final save
+        self.ended = False
+
         # Interim transcript tracking
-        self.live_transcript: str = ""  # Current interim + finalized text
+        self._live_transcript: str | None = ""  # Finalized + interim, built on read
         self.last_interim_text: str = ""  # Last interim result received
         self.last_interim_update_time: float = 0
     
     def add_transcript_chunk(self, chunk: str) -> None:
         """Add a new transcript chunk (final result)."""
         if chunk:
-            self.full_transcript += " " + chunk if self.full_transcript else chunk
-            self.last_updated = time.time()
+            if self._transcript_chunks:
+                self.transcript_length += 1  # Joining space
+            self._transcript_chunks.append(chunk)
+            self.transcript_length += len(chunk)
+            self._full_transcript = None
+            self.touch(time.time())
             self.chunk_count += 1
-            # Update live transcript to match (interim is now finalized)
-            self.live_transcript = self.full_transcript
+            # Live transcript now matches the finalized one (interim is final)
+            self._live_transcript = None
             self.last_interim_text = ""  # Clear interim since it's now final
 
+    @property
+    def full_transcript(self) -> str:
+        """Finalized transcript, joined on first read after a new chunk."""
+        if self._full_transcript is None:
+            self._full_transcript = " ".join(self._transcript_chunks)
+        return self._full_transcript
+
+    @property
+    def live_transcript(self) -> str:
+        """Finalized transcript plus the current interim, joined on first read."""
+        if self._live_transcript is None:
+            full = self.full_transcript
+            interim = self.last_interim_text
+            self._live_transcript = f"{full} {interim}" if full and interim else full or interim
+        return self._live_transcript
+
     def update_interim_transcript(self, interim_text: str) -> bool:
         """
         Update the live transcript with interim result.
@@ -50,33 +86,52 @@ class CallSession:
         if not interim_text:
             return False
 
-        # Construct live transcript: finalized + current interim
-        new_live = self.full_transcript
-        if new_live and interim_text:
-            new_live += " " + interim_text
-        elif interim_text:
-            new_live = interim_text
-
-        # Check if it changed
-        if new_live == self.live_transcript:
+        # The finalized part only changes in add_transcript_chunk (which
+        # clears last_interim_text), so comparing the interim text is enough
+        if interim_text == self.last_interim_text:
             return False
 
         # Update
-        self.live_transcript = new_live
+        self._live_transcript = None
         self.last_interim_text = interim_text
         self.last_interim_update_time = time.time()
-        self.last_updated = time.time()
+        self.touch(self.last_interim_update_time)
 
         return True
 
     def update_canonical(self, new_data: CanonicalV2) -> None:
-        """Update canonical data."""
-        self.canonical_data = new_data
-        self.last_updated = time.time()
+        """Update canonical data (stored by reference, not re-validated)."""
+        if new_data is not self.canonical_data:
+            self.canonical_data = new_data
+            self._canonical_dump = None
+            self._canonical_prompt_block = None
+        self.touch(time.time())
+
+    def touch(self, now: float) -> None:
+        """Mark the session as updated at now."""
+        self.last_updated = now
+        if self.on_touch is not None:
+            self.on_touch(self.session_id)
+
+    def canonical_dump(self) -> dict[str, Any]:
+        """
+        Get canonical data as a dict, cached until the next update_canonical.
+
+        The returned dict is shared between callers and must not be mutated.
+        """
+        if self._canonical_dump is None:
+            self._canonical_dump = self.canonical_data.model_dump()
+        return self._canonical_dump
+    
+    def canonical_prompt_block(self) -> str:
+        """Get the Claude prompt block for the canonical data, cached until the next update_canonical."""
+        if self._canonical_prompt_block is None:
+            self._canonical_prompt_block = build_existing_data_block(self.canonical_data)
+        return self._canonical_prompt_block
     
     def get_duration(self) -> float:
-        """Get session duration in seconds."""
-        return time.time() - self.created_at
+        """Get session duration in seconds (monotonic, unaffected by clock changes)."""
+        return time.monotonic() - self.created_monotonic
 
     def should_extract_with_claude(
         self, chunk_text: str, min_interval: float = 5.0, min_chars: int = 50
@@ -116,7 +171,7 @@ class CallSession:
             return False
 
         # Check if enough new content accumulated
-        chars_since_last = len(self.full_transcript) - self.last_extraction_length
+        chars_since_last = self.transcript_length - self.last_extraction_length
         if chars_since_last >= min_chars:
             return True
 
@@ -137,10 +192,8 @@ class CallSession:
         """
         current_time = time.time()
 
-        # Create hash of canonical data
-        canonical_hash = hashlib.md5(
-            json.dumps(canonical.model_dump(), sort_keys=True).encode()
-        ).hexdigest()
+        # Create hash of canonical data (serialized in field order by pydantic-core)
+        canonical_hash = hashlib.md5(canonical.model_dump_json().encode()).hexdigest()
 
         # Always update on first call
         if self.last_convex_update_time == 0:
@@ -171,13 +224,21 @@ class SessionManager:
     """Manages active call sessions."""
     
     def __init__(self):
-        self._sessions: Dict[str, CallSession] = {}
+        # Ordered by last_updated (least recently updated first)
+        self._sessions: OrderedDict[str, CallSession] = OrderedDict()
     
     def create_session(self, session_id: str) -> CallSession:
         """Create a new call session."""
         session = CallSession(session_id)
+        session.on_touch = self._touch
         self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
         return session
+
+    def _touch(self, session_id: str) -> None:
+        """Move an updated session to the most recent end."""
+        if session_id in self._sessions:
+            self._sessions.move_to_end(session_id)
     
     def get_session(self, session_id: str) -> CallSession | None:
         """Get an existing session."""
@@ -192,18 +253,24 @@ class SessionManager:
     
     def remove_session(self, session_id: str) -> CallSession | None:
         """Remove and return a session."""
-        return self._sessions.pop(session_id, None)
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.on_touch = None
+        return session
     
     def cleanup_old_sessions(self, max_age_seconds: float = 3600) -> int:
-        """Remove sessions older than max_age_seconds."""
+        """Remove sessions not updated in the last max_age_seconds."""
         now = time.time()
-        to_remove = [
-            sid for sid, session in self._sessions.items()
-            if now - session.last_updated > max_age_seconds
-        ]
-        for sid in to_remove:
-            self._sessions.pop(sid, None)
-        return len(to_remove)
+        removed = 0
+        # Oldest first, so stop at the first session that is still fresh
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_updated <= max_age_seconds:
+                break
+            self._sessions.popitem(last=False)
+            session.on_touch = None
+            removed += 1
+        return removed
     
     def get_active_count(self) -> int:
         """Get number of active sessions."""
@@ -1,12 +1,27 @@
 """Audio transcription services using Azure Speech SDK."""
 
 import asyncio
+import functools
 from typing import AsyncGenerator
 
 import azure.cognitiveservices.speech as speechsdk
+import httpx
 
 from ..config import settings
 
+# Global HTTP client for connection reuse (token requests)
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the global pooled HTTP client."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+    return _http_client
 
 # Preset configurations for different noise environments
 NOISE_PRESETS = {
@@ -24,33 +39,39 @@ NOISE_PRESETS = {
     },
 }
 
-
-async def transcribe_audio_stream_azure(
-    audio_stream: AsyncGenerator[bytes, None],
-    session_id: str,
-    audio_format: str = "mulaw",
-    segmentation_silence_ms: int = 700,
-) -> AsyncGenerator[tuple[str, bool], None]:
+# Emergency phrases added to every recognizer for better recognition
+EMERGENCY_PHRASES = (
+    "emergencia",
+    "ambulancia",
+    "consciente",
+    "inconsciente",
+    "respira",
+    "no respira",
+    "alerta",
+    "verbal",
+    "dolor",
+    "paciente",
+    "direccion",
+    "comuna",
+    "Las Condes",
+    "Providencia",
+    "Vitacura",
+    "Santiago",
+    "Ñuñoa",
+    "Apoquindo",
+    "Los Leones",
+    "MUT",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_speech_config(segmentation_silence_ms: int) -> speechsdk.SpeechConfig:
     """
-    Transcribe audio stream using Azure Speech SDK.
-
-    Args:
-        audio_stream: AsyncGenerator yielding audio bytes
-        session_id: Unique session identifier for logging
-        audio_format: Audio format - "mulaw" for Twilio (8kHz Mu-law) or "pcm16" for standard PCM
-        segmentation_silence_ms: Milliseconds of silence before finalizing (default: 700ms)
-                                 Lower = faster finalization, better for noisy environments
-                                 Higher = more patient, waits longer for continuation
+    Get the Azure SpeechConfig for a segmentation silence setting.
 
-    Yields tuples of (text, is_final).
+    The config is identical across sessions, so it is built once per setting;
+    each SpeechRecognizer copies it on creation.
     """
-    import logging
-    logger = logging.getLogger(__name__)
-
-    if not settings.AZURE_SPEECH_KEY or not settings.AZURE_SPEECH_REGION:
-        raise ValueError("Azure Speech credentials not configured")
-
-    # Configure Azure Speech
     speech_config = speechsdk.SpeechConfig(
         subscription=settings.AZURE_SPEECH_KEY,
         region=settings.AZURE_SPEECH_REGION,
@@ -97,6 +118,37 @@ async def transcribe_audio_stream_azure(
     # 7. Enable detailed results for better accuracy tracking
     speech_config.output_format = speechsdk.OutputFormat.Detailed
 
+    return speech_config
+
+
+async def transcribe_audio_stream_azure(
+    audio_stream: AsyncGenerator[bytes, None],
+    session_id: str,
+    audio_format: str = "mulaw",
+    segmentation_silence_ms: int = 700,
+) -> AsyncGenerator[tuple[str, bool], None]:
+    """
+    Transcribe audio stream using Azure Speech SDK.
+
+    Args:
+        audio_stream: AsyncGenerator yielding audio bytes
+        session_id: Unique session identifier for logging
+        audio_format: Audio format - "mulaw" for Twilio (8kHz Mu-law) or "pcm16" for standard PCM
+        segmentation_silence_ms: Milliseconds of silence before finalizing (default: 700ms)
+                                 Lower = faster finalization, better for noisy environments
+                                 Higher = more patient, waits longer for continuation
+
+    Yields tuples of (text, is_final).
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    if not settings.AZURE_SPEECH_KEY or not settings.AZURE_SPEECH_REGION:
+        raise ValueError("Azure Speech credentials not configured")
+
+    # Shared config for this silence setting (built once, copied per recognizer)
+    speech_config = get_speech_config(segmentation_silence_ms)
+
     # Configure audio format based on input type
     if audio_format == "mulaw":
         # Twilio sends 8kHz Mu-law mono
@@ -126,67 +178,45 @@ async def transcribe_audio_stream_azure(
 
     # Add emergency phrases for better recognition
     phrase_list = speechsdk.PhraseListGrammar.from_recognizer(recognizer)
-    emergency_phrases = [
-        "emergencia",
-        "ambulancia",
-        "consciente",
-        "inconsciente",
-        "respira",
-        "no respira",
-        "alerta",
-        "verbal",
-        "dolor",
-        "paciente",
-        "direccion",
-        "comuna",
-        "Las Condes",
-        "Providencia",
-        "Vitacura",
-        "Santiago",
-        "Ñuñoa",
-        "Apoquindo",
-        "Los Leones",
-        "MUT",
-    ]
-    for phrase in emergency_phrases:
+    for phrase in EMERGENCY_PHRASES:
         phrase_list.addPhrase(phrase)
 
     # Results queue
     results_queue: asyncio.Queue[tuple[str, bool] | None] = asyncio.Queue()
 
-    # Get the event loop for thread-safe task creation
-    loop = asyncio.get_event_loop()
+    # Get the event loop for thread-safe queue operations
+    loop = asyncio.get_running_loop()
 
     # Event handlers (called from SDK threads, need thread-safe queue operations)
     def recognizing_handler(evt: speechsdk.SpeechRecognitionEventArgs) -> None:
         """Handle interim results."""
         if evt.result.reason == speechsdk.ResultReason.RecognizingSpeech:
-            # Thread-safe: schedule task in the event loop
-            asyncio.run_coroutine_threadsafe(
-                results_queue.put((evt.result.text, False)), loop
+            # Thread-safe: schedule the put in the event loop
+            loop.call_soon_threadsafe(
+                results_queue.put_nowait, (evt.result.text, False)
             )
 
     def recognized_handler(evt: speechsdk.SpeechRecognitionEventArgs) -> None:
         """Handle final results."""
         if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
-            # Thread-safe: schedule task in the event loop
-            asyncio.run_coroutine_threadsafe(
-                results_queue.put((evt.result.text, True)), loop
+            # Thread-safe: schedule the put in the event loop
+            loop.call_soon_threadsafe(
+                results_queue.put_nowait, (evt.result.text, True)
             )
         elif evt.result.reason == speechsdk.ResultReason.NoMatch:
-            logger.warning(f"No speech recognized in session {session_id}")
+            logger.warning("No speech recognized in session %s", session_id)
 
     def session_stopped_handler(evt: speechsdk.SessionEventArgs) -> None:
         """Handle session end."""
-        logger.info(f"Azure Speech session stopped for {session_id}")
-        asyncio.run_coroutine_threadsafe(results_queue.put(None), loop)
+        logger.info("Azure Speech session stopped for %s", session_id)
+        loop.call_soon_threadsafe(results_queue.put_nowait, None)
 
     def canceled_handler(evt: speechsdk.SpeechRecognitionCanceledEventArgs) -> None:
         """Handle recognition cancellation/errors."""
-        logger.error(f"Azure Speech recognition canceled for {session_id}: {evt.reason}")
+        logger.error("Azure Speech recognition canceled for %s: %s", session_id, evt.reason)
         if evt.reason == speechsdk.CancellationReason.Error:
-            logger.error(f"Error details: {evt.error_details}")
-        asyncio.run_coroutine_threadsafe(results_queue.put(None), loop)
+            logger.error("Error details: %s", evt.error_details)
+        loop.call_soon_threadsafe(results_queue.put_nowait, None)
 
     # Connect handlers
     recognizer.recognizing.connect(recognizing_handler)
@@ -195,7 +225,7 @@ async def transcribe_audio_stream_azure(
     recognizer.canceled.connect(canceled_handler)
 
     # Start continuous recognition
-    logger.info(f"Starting Azure Speech recognition for session {session_id}")
+    logger.info("Starting Azure Speech recognition for session %s", session_id)
     recognizer.start_continuous_recognition()
 
     # Feed audio stream
@@ -206,13 +236,13 @@ async def transcribe_audio_stream_azure(
             async for chunk in audio_stream:
                 push_stream.write(chunk)
                 chunk_count += 1
-            logger.info(f"Finished feeding {chunk_count} audio chunks for session {session_id}")
+            logger.info("Finished feeding %s audio chunks for session %s", chunk_count, session_id)
             push_stream.close()
         except Exception as e:
-            logger.error(f"Error feeding audio for session {session_id}: {e}")
+            logger.error("Error feeding audio for session %s: %s", session_id, e)
             push_stream.close()
-            # Signal error by putting None in queue
-            asyncio.run_coroutine_threadsafe(results_queue.put(None), loop)
+            # Signal error by putting None in queue (already on the loop)
+            results_queue.put_nowait(None)
 
     # Start feeding audio in background
     feed_task = asyncio.create_task(feed_audio())
@@ -222,22 +252,22 @@ async def transcribe_audio_stream_azure(
         while True:
             result = await results_queue.get()
             if result is None:
-                logger.info(f"Recognition ended for session {session_id}")
+                logger.info("Recognition ended for session %s", session_id)
                 break
             yield result
     finally:
         # Cleanup
-        logger.info(f"Cleaning up Azure Speech resources for session {session_id}")
+        logger.info("Cleaning up Azure Speech resources for session %s", session_id)
         try:
             recognizer.stop_continuous_recognition()
         except Exception as e:
-            logger.error(f"Error stopping recognizer: {e}")
+            logger.error("Error stopping recognizer: %s", e)
 
         # Wait for feed task to complete
         try:
             await asyncio.wait_for(feed_task, timeout=2.0)
         except asyncio.TimeoutError:
-            logger.warning(f"Feed task timeout for session {session_id}")
+            logger.warning("Feed task timeout for session %s", session_id)
             feed_task.cancel()
 
 
@@ -258,23 +288,22 @@ async def get_azure_speech_token() -> dict[str, str | int]:
     else:
         raise ValueError("AZURE_SPEECH_REGION or AZURE_SPEECH_ENDPOINT required")
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post(
-            token_url,
-            headers={
-                "Ocp-Apim-Subscription-Key": settings.AZURE_SPEECH_KEY,
-                "Content-Length": "0",
-            },
-        )
+    response = await get_http_client().post(
+        token_url,
+        headers={
+            "Ocp-Apim-Subscription-Key": settings.AZURE_SPEECH_KEY,
+            "Content-Length": "0",
+        },
+    )
 
-        if response.status_code != 200:
-            raise ValueError(f"Token request failed: {response.text}")
+    if response.status_code != 200:
+        raise ValueError(f"Token request failed: {response.text}")
 
-        token = response.text.strip()
+    token = response.text.strip()
 
-        return {
-            "token": token,
-            "region": region or "",
-            "endpoint": endpoint or "",
-            "expires_in": 600,
-        }
+    return {
+        "token": token,
+        "region": region or "",
+        "endpoint": endpoint or "",
+        "expires_in": 600,
+    }
@@ -1,19 +1,82 @@
 import asyncio
-import base64
-import json
 import logging
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
+import orjson
+import pybase64
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from ..core import end_session, process_text_chunk
+from ..services.convex_db import get_convex_service
 from ..services.session import session_manager
 from ..services.transcription import transcribe_audio_stream_azure
 
 router = APIRouter()
 
 logger = logging.getLogger("twilio_stream")
-logging.basicConfig(level=logging.INFO)
+
+# Maximum time the transcription loop waits on a Convex interim update
+CONVEX_INTERIM_TIMEOUT_SECONDS = 0.5
+
+# At stream end, how long to wait for an interim update still in flight so it
+# cannot re-activate the incident after the final save
+CONVEX_INTERIM_DRAIN_SECONDS = 5.0
+
+# Final results are batched into one process_text_chunk call after this much
+# quiet time, or as soon as the buffered text reaches FINAL_FLUSH_CHARS
+FINAL_DEBOUNCE_SECONDS = 1.5
+FINAL_FLUSH_CHARS = 400
+
+# How long the handler waits for transcription to wind down once the audio
+# ends. Covers the final flush of buffered finals, which is one Claude
+# extraction (30 s request timeout) plus the Convex drain.
+TRANSCRIPTION_SHUTDOWN_TIMEOUT_SECONDS = 45.0
+
+# Twilio sends 20 ms frames (160 bytes of 8 kHz Mu-law); coalesce 10 of them
+# (200 ms) per push to the recognizer
+AUDIO_COALESCE_BYTES = 1600
+
+# Capacity of the pre-allocated coalescing buffer: a full chunk plus headroom
+# for the frame that crosses the threshold
+AUDIO_BUFFER_BYTES = AUDIO_COALESCE_BYTES * 2
+
+# Bound on queued audio chunks (~40 s at 200 ms per chunk). When the
+# recognizer falls behind, the oldest audio is dropped: for a live emergency
+# call, fresh audio matters more than catching up on stale audio.
+AUDIO_QUEUE_MAX_CHUNKS = 200
+
+# Twilio serializes compact JSON with "event" first, so a prefix check
+# identifies the frame type before any parsing
+MEDIA_FRAME_PREFIX = '{"event":"media"'
+MARK_FRAME_PREFIX = '{"event":"mark"'
+PAYLOAD_MARKER = '"payload":"'
+
+
+async def send_json(websocket: WebSocket, data: dict[str, Any]) -> None:
+    """Send a JSON text frame serialized with orjson."""
+    await websocket.send_text(orjson.dumps(data).decode())
+
+
+def extract_media_payload(message: str) -> str | None:
+    """
+    Slice the base64 payload out of a media frame without parsing the JSON.
+
+    Returns None when the message is not a media frame in Twilio's compact
+    shape, in which case the caller falls back to orjson.
+    """
+    if not message.startswith(MEDIA_FRAME_PREFIX):
+        return None
+    start = message.find(PAYLOAD_MARKER, len(MEDIA_FRAME_PREFIX))
+    if start < 0:
+        return None
+    start += len(PAYLOAD_MARKER)
+    end = message.find('"', start)
+    if end < 0:
+        return None
+    payload = message[start:end]
+    if "\\" in payload:  # JSON escapes need a real parse
+        return None
+    return payload
 
 
 @router.websocket("/twilio-stream")
@@ -31,11 +94,55 @@ async def twilio_stream_websocket(websocket: WebSocket):
         logger.warning("No dispatcher_id provided in query params. Using fallback.")
         dispatcher_id = "js7crtvfa7c5ctm6j09q8n16sh7vwrtk"
 
-    logger.info(f"Using dispatcher_id: {dispatcher_id}")
+    logger.info("Using dispatcher_id: %s", dispatcher_id)
 
     stream_sid = None
     frame_count = 0
-    audio_queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+    audio_queue: asyncio.Queue[bytes | None] = asyncio.Queue(
+        maxsize=AUDIO_QUEUE_MAX_CHUNKS
+    )
+    # Frames not yet pushed to audio_queue, written in place up to audio_len
+    audio_buffer = bytearray(AUDIO_BUFFER_BYTES)
+    audio_view = memoryview(audio_buffer)
+    audio_len = 0
+    dropped_chunks = 0
+
+    def enqueue_audio(item: bytes | None) -> None:
+        """Queue audio (or the end-of-stream None), dropping the oldest chunk if full."""
+        nonlocal dropped_chunks
+        try:
+            audio_queue.put_nowait(item)
+        except asyncio.QueueFull:
+            audio_queue.get_nowait()
+            audio_queue.put_nowait(item)
+            dropped_chunks += 1
+            if dropped_chunks == 1 or dropped_chunks % 50 == 0:
+                logger.warning(
+                    "Audio queue full, dropped %d oldest chunks so far", dropped_chunks
+                )
+
+    def flush_audio() -> None:
+        """Push any buffered audio to the recognizer queue."""
+        nonlocal audio_len
+        if audio_len:
+            enqueue_audio(bytes(audio_view[:audio_len]))
+            audio_len = 0
+
+    def buffer_audio(frame: bytes) -> None:
+        """Append a decoded frame, flushing once a full chunk is buffered."""
+        nonlocal audio_len
+        end = audio_len + len(frame)
+        if end > AUDIO_BUFFER_BYTES:
+            # Only reachable with frames far larger than Twilio's 160 bytes
+            flush_audio()
+            if len(frame) > AUDIO_BUFFER_BYTES:
+                enqueue_audio(frame)
+                return
+            end = len(frame)
+        audio_buffer[audio_len:end] = frame
+        audio_len = end
+        if audio_len >= AUDIO_COALESCE_BYTES:
+            flush_audio()
 
     async def audio_stream_generator() -> AsyncGenerator[bytes, None]:
         """Generate audio chunks from the queue for Azure Speech SDK."""
@@ -48,27 +155,32 @@ async def twilio_stream_websocket(websocket: WebSocket):
 
     async def process_transcriptions(session_id: str) -> None:
         """Process transcription results from Azure Speech SDK."""
+        interim_update_task: asyncio.Task | None = None
+
+        # Buffered final results waiting to be processed as one chunk
+        pending_finals: list[str] = []
+        flush_handle: asyncio.TimerHandle | None = None
+        flush_lock = asyncio.Lock()  # Keeps batches in order
+        flush_tasks: set[asyncio.Task] = set()
+        loop = asyncio.get_running_loop()
+
+        def log_interim_failure(task: asyncio.Task) -> None:
+            """Retrieve the interim update's outcome, even if nobody awaited it."""
+            if not task.cancelled() and task.exception() is not None:
+                logger.debug("Convex interim update failed: %s", task.exception())
+
         try:
             # Get session for interim tracking
             session = session_manager.get_or_create_session(session_id)
 
-            # Start Azure Speech recognition with streaming audio
-            # TUNING: Adjust segmentation_silence_ms for different noise levels:
-            # - 500ms: Very noisy (emergency scenes, sirens, traffic)
-            # - 700ms: Moderate noise (default, good balance)
-            # - 1000ms: Quiet environment (clean audio)
-            async for text, is_final in transcribe_audio_stream_azure(
-                audio_stream=audio_stream_generator(),
-                session_id=session_id,
-                audio_format="mulaw",  # Twilio sends Mu-law encoded audio
-                segmentation_silence_ms=700,  # Adjust based on noise level
-            ):
-                if not text:
-                    continue
+            async def flush_finals() -> None:
+                """Process buffered final results through the full pipeline."""
+                async with flush_lock:
+                    if not pending_finals:
+                        return
+                    text = " ".join(pending_finals)
+                    pending_finals.clear()
 
-                if is_final:
-                    # Process final results through full pipeline
-                    logger.info(f"Final transcription: {text}")
                     try:
                         result = await process_text_chunk(
                             chunk_text=text,
@@ -79,118 +191,223 @@ async def twilio_stream_websocket(websocket: WebSocket):
 
                         # Send final result to frontend via WebSocket
                         try:
-                            await websocket.send_json({
+                            await send_json(websocket, {
                                 "type": "final_transcript",
                                 "text": text,
                                 "canonical": result["canonical"],
                                 "session_id": session_id,
                             })
                         except Exception as ws_error:
-                            logger.warning(f"WebSocket send failed: {ws_error}")
+                            logger.warning("WebSocket send failed: %s", ws_error)
 
                     except Exception as e:
-                        logger.error(f"Error processing transcription: {e}")
+                        logger.error("Error processing transcription: %s", e)
+
+            def schedule_flush() -> None:
+                """Start a background flush of the buffered final results."""
+                nonlocal flush_handle
+                if flush_handle is not None:
+                    flush_handle.cancel()
+                    flush_handle = None
+                task = asyncio.create_task(flush_finals())
+                flush_tasks.add(task)
+                task.add_done_callback(flush_tasks.discard)
+
+            # Start Azure Speech recognition with streaming audio
+            # TUNING: Adjust segmentation_silence_ms for different noise levels:
+            # - 500ms: Very noisy (emergency scenes, sirens, traffic)
+            # - 700ms: Moderate noise (default, good balance)
+            # - 1000ms: Quiet environment (clean audio)
+            async for text, is_final in transcribe_audio_stream_azure(
+                audio_stream=audio_stream_generator(),
+                session_id=session_id,
+                audio_format="mulaw",  # Twilio sends Mu-law encoded audio
+                segmentation_silence_ms=700,  # Adjust based on noise level
+            ):
+                if not text:
+                    continue
+
+                if is_final:
+                    # Buffer final results; flush after a quiet window or
+                    # once enough text has accumulated
+                    logger.info("Final transcription: %s", text)
+                    pending_finals.append(text)
+                    if sum(map(len, pending_finals)) >= FINAL_FLUSH_CHARS:
+                        schedule_flush()
+                    else:
+                        if flush_handle is not None:
+                            flush_handle.cancel()
+                        flush_handle = loop.call_later(
+                            FINAL_DEBOUNCE_SECONDS, schedule_flush
+                        )
                 else:
                     # REAL-TIME INTERIM UPDATES
-                    # Update session's live transcript
-                    transcript_changed = session.update_interim_transcript(text)
+                    # Update session's live transcript (buffered finals are
+                    # not in the session transcript yet, so show them too)
+                    transcript_changed = session.update_interim_transcript(
+                        " ".join([*pending_finals, text])
+                    )
 
                     if transcript_changed:
-                        logger.debug(f"Interim transcription: {text}")
+                        logger.debug("Interim transcription: %s", text)
 
-                        # Send to Convex for real-time display
-                        try:
-                            from ..services.convex_db import get_convex_service
-                            convex = get_convex_service()
-
-                            # Run in thread pool (Convex client is sync)
-                            await asyncio.to_thread(
-                                convex.update_interim_transcript,
-                                session_id=session_id,
-                                live_transcript=session.live_transcript,
-                                dispatcher_id=dispatcher_id,
-                            )
-                        except Exception as convex_error:
-                            logger.debug(f"Convex interim update failed: {convex_error}")
+                        # Send to Convex for real-time display. Skip while the
+                        # previous update is still running; the next interim
+                        # result carries the latest live transcript anyway.
+                        if interim_update_task is None or interim_update_task.done():
+                            try:
+                                convex = get_convex_service()
+
+                                # Run in thread pool (Convex client is sync)
+                                interim_update_task = asyncio.create_task(
+                                    asyncio.to_thread(
+                                        convex.update_interim_transcript,
+                                        session_id=session_id,
+                                        live_transcript=session.live_transcript,
+                                        dispatcher_id=dispatcher_id,
+                                        is_ended=lambda: session.ended,
+                                    )
+                                )
+                                interim_update_task.add_done_callback(log_interim_failure)
+                                # Bound the wait; a slow Convex call keeps
+                                # running in the background
+                                done, _ = await asyncio.wait(
+                                    {interim_update_task},
+                                    timeout=CONVEX_INTERIM_TIMEOUT_SECONDS,
+                                )
+                                if not done:
+                                    logger.debug("Convex interim update still running, not waiting")
+                            except Exception as convex_error:
+                                logger.debug("Convex interim update failed: %s", convex_error)
 
                         # Also send via WebSocket for immediate feedback
                         try:
-                            await websocket.send_json({
+                            await send_json(websocket, {
                                 "type": "interim_transcript",
                                 "text": text,
                                 "live_transcript": session.live_transcript,
                                 "session_id": session_id,
                             })
                         except Exception as ws_error:
-                            logger.debug(f"WebSocket send failed for interim: {ws_error}")
+                            logger.debug("WebSocket send failed for interim: %s", ws_error)
+
+            # Stream ended: process whatever is still buffered
+            if flush_handle is not None:
+                flush_handle.cancel()
+            await flush_finals()
+            if flush_tasks:
+                await asyncio.gather(*flush_tasks)
 
         except Exception as e:
-            logger.error(f"Error in transcription processing: {e}")
+            logger.error("Error in transcription processing: %s", e)
+
+        finally:
+            # If we were cancelled or failed before the final flush, stop any
+            # batch still pending so nothing runs process_text_chunk after
+            # end_session has done the final save
+            if flush_handle is not None:
+                flush_handle.cancel()
+            if flush_tasks:
+                pending = list(flush_tasks)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+            # Don't return (and let end_session run) while an interim update
+            # that timed out earlier is still writing to Convex
+            if interim_update_task is not None and not interim_update_task.done():
+                await asyncio.wait(
+                    {interim_update_task}, timeout=CONVEX_INTERIM_DRAIN_SECONDS
+                )
+                if not interim_update_task.done():
+                    # Cancelling only abandons the await: the worker thread
+                    # still finishes the Convex call in progress. It checks
+                    # session.ended, so after end_session it won't set the
+                    # active incident again
+                    logger.warning("Convex interim update still running at stream end")
+                    interim_update_task.cancel()
 
     transcription_task = None
 
+    # Per-frame callables bound once, so the hot loop reads locals instead of
+    # repeating attribute lookups ~50 times per second
+    receive_text = websocket.receive_text
+    b64decode = pybase64.b64decode
+
     try:
         while True:
-            message = await websocket.receive_text()
-            data = json.loads(message)
-            event_type = data.get("event")
+            message = await receive_text()
+            payload = extract_media_payload(message)
+            if payload is None:
+                if message.startswith(MARK_FRAME_PREFIX):
+                    # Playback acknowledgements carry nothing we use
+                    continue
+                data = orjson.loads(message)
+                match data.get("event"):
+                    case "media":
+                        payload = data.get("media", {}).get("payload")
 
-            if event_type == "connected":
-                logger.info(f"Twilio Media Stream connected: {data}")
+                    case "start":
+                        stream_sid = data.get("start", {}).get("streamSid")
+                        logger.info("Media Stream started. Stream SID: %s", stream_sid)
 
-            elif event_type == "start":
-                stream_sid = data.get("start", {}).get("streamSid")
-                logger.info(f"Media Stream started. Stream SID: {stream_sid}")
+                        # Start transcription processing in background
+                        if stream_sid:
+                            transcription_task = asyncio.create_task(
+                                process_transcriptions(stream_sid)
+                            )
+                            logger.info("Started Azure Speech recognition task")
 
-                # Start transcription processing in background
-                if stream_sid:
-                    transcription_task = asyncio.create_task(
-                        process_transcriptions(stream_sid)
-                    )
-                    logger.info("Started Azure Speech recognition task")
-
-            elif event_type == "media":
-                payload = data.get("media", {}).get("payload")
-                if payload:
-                    # Decode Twilio's base64-encoded audio
-                    chunk = base64.b64decode(payload)
-                    # Feed directly to Azure Speech SDK (no buffering)
-                    await audio_queue.put(chunk)
-                    frame_count += 1
-
-            elif event_type == "stop":
-                logger.info(f"Media Stream stopped. Total frames received: {frame_count}")
-                # Signal end of audio stream
-                await audio_queue.put(None)
-                break
+                    case "connected":
+                        logger.info("Twilio Media Stream connected: %s", data)
+
+                    case "stop":
+                        logger.info(
+                            "Media Stream stopped. Total frames received: %d", frame_count
+                        )
+                        # Signal end of audio stream
+                        flush_audio()
+                        enqueue_audio(None)
+                        break
+
+            if payload:
+                # Decode Twilio's base64-encoded audio (SIMD decoder, no
+                # validation pass: Twilio payloads are always well-formed)
+                # and feed it to Azure Speech SDK in coalesced chunks
+                buffer_audio(b64decode(payload, validate=False))
+                frame_count += 1
 
     except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected. Total frames received: {frame_count}")
+        logger.info("WebSocket disconnected. Total frames received: %d", frame_count)
         # Signal end of audio stream
-        await audio_queue.put(None)
+        flush_audio()
+        enqueue_audio(None)
     except Exception as e:
-        logger.error(f"Error in WebSocket handler: {e}")
-        await audio_queue.put(None)
+        logger.error("Error in WebSocket handler: %s", e)
+        flush_audio()
+        enqueue_audio(None)
     finally:
         # Wait for transcription task to complete
         if transcription_task:
             try:
-                await asyncio.wait_for(transcription_task, timeout=5.0)
+                await asyncio.wait_for(
+                    transcription_task, timeout=TRANSCRIPTION_SHUTDOWN_TIMEOUT_SECONDS
+                )
                 logger.info("Transcription task completed")
             except asyncio.TimeoutError:
                 logger.warning("Transcription task timeout, canceling")
                 transcription_task.cancel()
             except Exception as e:
-                logger.error(f"Error waiting for transcription task: {e}")
+                logger.error("Error waiting for transcription task: %s", e)
 
         # Cleanup and save session
         if stream_sid:
-            logger.info(f"Ending session for Stream SID: {stream_sid}")
+            logger.info("Ending session for Stream SID: %s", stream_sid)
             try:
-                end_session(
+                await end_session(
                     session_id=stream_sid,
                     save_to_convex=True,
                     dispatcher_id=dispatcher_id,
                 )
             except Exception as e:
-                logger.error(f"Error ending session: {e}")
+                logger.error("Error ending session: %s", e)